@@ -2,6 +2,7 @@ import sys
 from PyQt5.QtWidgets import QApplication
 from environment import ensure_package_installed, clean_environment
 from ui import VideoProcessorUI
+from utils import ConfigHandler
 
 # Ensure necessary packages are installed
 ensure_package_installed("PyQt5")
@@ -15,4 +16,6 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = VideoProcessorUI()
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    ConfigHandler.flush()  # Write any pending settings changes
+    sys.exit(exit_code)
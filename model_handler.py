@@ -1,6 +1,8 @@
 from ultralytics import YOLO
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 def load_classes(json_path):
     with open(json_path, "r") as f:
@@ -13,3 +15,110 @@ def find_json_for_model(model_path):
     model_dir, model_name = os.path.split(model_path)
     json_path = os.path.join(model_dir, f"{os.path.splitext(model_name)[0]}.json")
     return json_path if os.path.exists(json_path) else None
+
+def detect_objects(model, frame):
+    """
+    Runs a single model on the frame.
+
+    :param model: Loaded YOLO model.
+    :param frame: Video frame (BGR).
+    :return: List of (x1, y1, x2, y2, class index, confidence %) tuples.
+    """
+    detections = []
+    for r in model(frame, stream=True, verbose=False):
+        for box in r.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            detections.append((x1, y1, x2, y2, int(box.cls[0]), float(box.conf[0]) * 100))
+    return detections
+
+
+class MultiModelRunner:
+    """
+    Runs several registered models on each decoded frame.
+
+    Models run concurrently in a thread pool; their class tables are merged by
+    category with class IDs namespaced as "<model name>:<class id>".
+    """
+    DEFAULT_CATEGORY = "objects"  # Category for models shipped without a JSON file
+    def __init__(self, max_workers=None):
+        self.models = {}
+        self.class_names = {}
+        self.timings = {}
+        self.frames = 0
+        self.max_workers = max_workers
+        self._executor = None
+
+    def register(self, model_path, name=None, class_names=None):
+        """
+        Loads a model and merges its class table.
+
+        :param model_path: Path to the YOLO .pt model.
+        :param name: Namespace for the model classes (defaults to the file name).
+        :param class_names: Class table; by default read from the JSON next to the model,
+            or built from the model's own class names if there is none.
+        :return: Name under which the model was registered.
+        """
+        base = name or os.path.splitext(os.path.basename(model_path))[0]
+        name, suffix = base, 2
+        while name in self.models:
+            name = f"{base}_{suffix}"
+            suffix += 1
+
+        model = load_model(model_path)
+        if class_names is None:
+            json_path = find_json_for_model(model_path)
+            if json_path:
+                class_names = load_classes(json_path)
+            else:
+                class_names = {self.DEFAULT_CATEGORY: {str(class_id): class_name
+                                                       for class_id, class_name in model.names.items()}}
+
+        self.models[name] = model
+        self.timings[name] = 0.0
+        for category, classes in class_names.items():
+            merged = self.class_names.setdefault(category, {})
+            for class_id, class_name in classes.items():
+                merged[f"{name}:{class_id}"] = class_name
+        return name
+
+    def _run(self, name, frame):
+        start = time.perf_counter()
+        detections = detect_objects(self.models[name], frame)
+        elapsed = time.perf_counter() - start
+        return name, elapsed, [(x1, y1, x2, y2, f"{name}:{cls}", conf)
+                               for x1, y1, x2, y2, cls, conf in detections]
+
+    def detect(self, frame):
+        """
+        Runs all registered models on the same frame.
+
+        :param frame: Video frame (BGR).
+        :return: Detections of all models with namespaced class IDs.
+        """
+        if not self.models:
+            results = []
+        elif len(self.models) == 1:
+            results = [self._run(name, frame) for name in self.models]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers or len(self.models))
+            results = list(self._executor.map(lambda name: self._run(name, frame), self.models))
+
+        detections = []
+        for name, elapsed, model_detections in results:
+            self.timings[name] += elapsed
+            detections.extend(model_detections)
+        self.frames += 1
+        return detections
+
+    def timing_report(self):
+        """Returns the average inference time per frame for each model."""
+        frames = max(self.frames, 1)
+        return ", ".join(f"{name}: {total / frames * 1000:.1f} ms/frame"
+                         for name, total in self.timings.items())
+
+    def close(self):
+        """Shuts down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,357 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+from video_processing import draw_detections
+
+# FFmpeg backend only: reports whether the last raw (undecoded) packet is a keyframe
+CAP_PROP_LRF_HAS_KEY_FRAME = getattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME", 67)
+
+
+class FrameCache:
+    """LRU cache of decoded frames bounded by total size in megabytes."""
+    def __init__(self, max_mb=256):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.nbytes = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, index):
+        with self._lock:
+            return index in self._frames
+
+    def get(self, index):
+        """Returns the cached frame and marks it as recently used, or None."""
+        with self._lock:
+            frame = self._frames.get(index)
+            if frame is not None:
+                self._frames.move_to_end(index)
+            return frame
+
+    def put(self, index, frame):
+        """Adds a frame, evicting the least recently used ones to stay within the limit."""
+        with self._lock:
+            old = self._frames.pop(index, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._frames[index] = frame
+            self.nbytes += frame.nbytes
+            while self.nbytes > self.max_bytes and len(self._frames) > 1:
+                _, evicted = self._frames.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
+
+
+class IndexBuild:
+    """In-flight or finished keyframe index build shared by players of one file."""
+    def __init__(self, signature):
+        self.signature = signature  # (mtime, size) of the indexed file
+        self.index = None
+        self.users = 0
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+
+
+class KeyframeIndex:
+    """
+    Sorted list of keyframe positions of a video file.
+
+    The index is built once per file (by demuxing packets without decoding them)
+    and shared between players opening the same unchanged file. keyframes is None
+    when the backend cannot report keyframes.
+    """
+    MAX_CACHED = 16
+    _builds = OrderedDict()  # Absolute path -> IndexBuild, least recently used first
+    _lock = threading.Lock()
+
+    def __init__(self, keyframes, frame_count):
+        self.keyframes = keyframes
+        self.frame_count = frame_count
+
+    @classmethod
+    def acquire(cls, path):
+        """
+        Registers a user of the file index, starting at most one build per file.
+
+        :param path: Path to the video file.
+        :return: Tuple (IndexBuild, owner flag); the owner must call run_build().
+        """
+        stat = os.stat(path)
+        path = os.path.abspath(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            build = cls._builds.get(path)
+            owner = False
+            if build is None or build.signature != signature or build.cancelled.is_set():
+                # The file changed (or its build was abandoned): drop the stale entry
+                if build is not None and not build.done.is_set():
+                    build.cancelled.set()
+                build = cls._builds[path] = IndexBuild(signature)
+                owner = True
+            cls._builds.move_to_end(path)
+            build.users += 1
+
+            # Evict finished indexes nobody is using beyond the cache limit
+            for stale_path in list(cls._builds):
+                if len(cls._builds) <= cls.MAX_CACHED:
+                    break
+                stale = cls._builds[stale_path]
+                if stale.users == 0 and stale.done.is_set():
+                    del cls._builds[stale_path]
+        return build, owner
+
+    @classmethod
+    def release(cls, build):
+        """Unregisters a user; a build nobody waits for any more is cancelled."""
+        with cls._lock:
+            build.users -= 1
+            if build.users <= 0 and not build.done.is_set():
+                build.cancelled.set()
+
+    @classmethod
+    def run_build(cls, path, build):
+        """Builds the index for an acquired entry and publishes the result."""
+        try:
+            build.index = cls.build(path, build.cancelled)
+        finally:
+            if build.index is None:
+                build.cancelled.set()
+                with cls._lock:
+                    path = os.path.abspath(path)
+                    if cls._builds.get(path) is build:
+                        del cls._builds[path]
+            build.done.set()
+
+    @classmethod
+    def for_file(cls, path):
+        """Returns the index for the file, building it or waiting for a build in progress."""
+        build, owner = cls.acquire(path)
+        try:
+            if owner:
+                cls.run_build(path, build)
+            build.done.wait()
+            return build.index
+        finally:
+            cls.release(build)
+
+    @classmethod
+    def build(cls, path, cancelled=None):
+        """
+        Scans the file packets in raw mode and records keyframe positions.
+
+        If the backend cannot report keyframes the index is marked unavailable;
+        seeks then rely on the backend seeking to the preceding keyframe itself.
+
+        :param cancelled: Optional Event that stops the scan; None is returned then.
+        """
+        cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+        keyframes = []
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if cap.isOpened() and cap.set(cv2.CAP_PROP_FORMAT, -1):
+            position = 0
+            while cap.grab():
+                if cancelled is not None and cancelled.is_set():
+                    cap.release()
+                    return None
+                if cap.get(CAP_PROP_LRF_HAS_KEY_FRAME):
+                    keyframes.append(position)
+                position += 1
+            frame_count = position
+        cap.release()
+
+        if not keyframes:
+            return cls(None, frame_count)
+        if keyframes[0] != 0:
+            keyframes.insert(0, 0)
+        return cls(keyframes, frame_count)
+
+    def nearest(self, index):
+        """Returns the last keyframe at or before the given frame index."""
+        lo, hi = 0, len(self.keyframes) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.keyframes[mid] <= index:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.keyframes[lo]
+
+
+class ReviewPlayer:
+    """
+    Frame-accurate random access over a video file for reviewing results.
+
+    Decoded frames are kept in an LRU cache around the playhead and a background
+    thread prefetches frames ahead of it, so stepping and short scrubs are served
+    from memory. Long seeks jump to the nearest preceding keyframe and decode forward;
+    until the keyframe index is built in the background, the backend seeks itself.
+    """
+    def __init__(self, path, cache_mb=256, prefetch=30, detections=None, class_names=None,
+                 on_frame_count=None):
+        """
+        :param path: Path to the input or processed video file.
+        :param cache_mb: Memory limit of the decoded frame cache in megabytes.
+        :param prefetch: Number of frames to decode ahead of the playhead.
+        :param detections: Optional mapping of frame index to stored detections to draw.
+        :param class_names: Dictionary mapping categories to class indices and names.
+        :param on_frame_count: Optional callback receiving the exact frame count once the
+            index is built; it is called from a worker thread.
+        """
+        self.path = path
+        self.on_frame_count = on_frame_count
+        self.prefetch = prefetch
+        self.detections = detections or {}
+        self.class_names = class_names or {}
+        self.cache = FrameCache(cache_mb)
+
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Unable to open video file {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 25.0
+        # Containers such as webm often report 0 or an estimate; None means unknown
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        self.index = None  # Built in the background, the file may be large or remote
+        self._index_build = None
+        self._index_lock = threading.Lock()
+        self.position = 0
+
+        self._next_decode = 0  # Frame index the next cap.read() will return
+        self._cap_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._running = True
+        self._prefetcher = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._prefetcher.start()
+        threading.Thread(target=self._build_index, daemon=True).start()
+
+    def frame(self, index=None):
+        """
+        Returns the frame at the given index (the playhead by default).
+
+        :param index: Frame index; clamped to the video range.
+        :return: BGR frame with stored detections drawn, or None if it cannot be decoded.
+        """
+        index = self.position if index is None else self._clamp(index)
+        frame = self.cache.get(index)
+        if frame is None:
+            frame = self._decode(index)
+            if frame is None:
+                return None
+
+        boxes = self.detections.get(index)
+        if boxes:
+            frame = frame.copy()
+            draw_detections(frame, boxes, self.class_names)
+        return frame
+
+    def seek(self, index):
+        """Moves the playhead and returns the frame there (None past the end of the video)."""
+        previous, self.position = self.position, self._clamp(index)
+        with self._wakeup:
+            self._wakeup.notify()
+        frame = self.frame()
+        if frame is None and self.frame_count is None:
+            # Ran past the end of a video with an unknown length
+            self.position = previous
+        return frame
+
+    def step(self, delta=1):
+        """Moves the playhead by delta frames (negative steps go back)."""
+        return self.seek(self.position + delta)
+
+    def _clamp(self, index):
+        """Limits the index to the video range; only the start is known until indexed."""
+        if self.frame_count is not None:
+            index = min(index, self.frame_count - 1)
+        return max(0, index)
+
+    def close(self):
+        """Stops the prefetch and index threads and releases the video file."""
+        self._running = False
+        with self._index_lock:
+            build, self._index_build = self._index_build, None
+        if build is not None:
+            KeyframeIndex.release(build)
+        with self._wakeup:
+            self._wakeup.notify()
+        self._prefetcher.join(timeout=1)
+        with self._cap_lock:
+            self.cap.release()
+        self.cache.clear()
+
+    def _decode(self, index):
+        """Decodes the frame at index, caching every frame decoded on the way."""
+        with self._cap_lock:
+            frame = self.cache.get(index)
+            if frame is not None:
+                return frame
+
+            # Short forward gaps are cheaper to decode through than to seek over
+            if not (self._next_decode <= index <= self._next_decode + self.prefetch):
+                keyframes = self.index
+                if keyframes is None or keyframes.keyframes is None:
+                    # No index: let the backend seek to the preceding keyframe itself
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                    self._next_decode = index
+                else:
+                    keyframe = keyframes.nearest(index)
+                    if not (keyframe <= self._next_decode <= index):
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+                        self._next_decode = keyframe
+
+            while self._next_decode <= index:
+                ret, frame = self.cap.read()
+                if not ret:
+                    return None
+                self.cache.put(self._next_decode, frame)
+                self._next_decode += 1
+            return frame
+
+    def _build_index(self):
+        """Builds (or waits for the shared build of) the keyframe index off the caller thread."""
+        try:
+            build, owner = KeyframeIndex.acquire(self.path)
+        except OSError as e:
+            print(f"Error: Unable to index video file {self.path}: {e}")
+            return
+        with self._index_lock:
+            if not self._running:
+                KeyframeIndex.release(build)
+                return
+            self._index_build = build
+
+        if owner:
+            KeyframeIndex.run_build(self.path, build)
+        build.done.wait()
+        if not self._running or build.index is None:
+            return
+
+        self.index = build.index
+        if build.index.frame_count > 0:
+            self.frame_count = build.index.frame_count
+            if self.on_frame_count is not None:
+                self.on_frame_count(self.frame_count)
+
+    def _prefetch_loop(self):
+        """Keeps the frames ahead of the playhead decoded and cached."""
+        while self._running:
+            start = self.position
+            idle = True
+            end = start + self.prefetch
+            if self.frame_count is not None:
+                end = min(end, self.frame_count)
+            for index in range(start, end):
+                if not self._running or self.position != start:
+                    idle = False
+                    break
+                if index not in self.cache and self._decode(index) is None:
+                    break
+            if idle:
+                with self._wakeup:
+                    if self._running and self.position == start:
+                        self._wakeup.wait()
@@ -1,7 +1,8 @@
 from PyQt5.QtWidgets import (
-    QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QGroupBox, QWidget, QMainWindow, QFileDialog, QScrollArea, QFrame
+    QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QGroupBox, QWidget, QMainWindow, QFileDialog, QScrollArea, QFrame,
+    QSlider
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QPixmap, QImage
 import os
 from collections import deque
@@ -10,11 +11,15 @@ import cv2
 from utils import ConfigHandler, generate_output_filename
 from video_processing import init_video_processing, process_frame, finalize_processing
 from frame_analysis import find_sharpest_frame
-from model_handler import load_model, find_json_for_model, load_classes
+from model_handler import MultiModelRunner
+from review_player import ReviewPlayer
 
 
 
 class VideoProcessorUI(QMainWindow):
+    # Точное число кадров просматриваемого видео (путь, число), приходит из фонового потока
+    review_frame_count_ready = pyqtSignal(str, int)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Video Processing with YOLO")
@@ -35,6 +40,11 @@ class VideoProcessorUI(QMainWindow):
         self.frame_buffer = deque(maxlen=5)
         self.class_names = None
         self.frozen_frames = []  # Список замороженных кадров
+        self.detections = {}  # Детекции по номеру кадра для просмотра
+        self.detections_path = None  # Входное видео, для которого получены детекции
+        self.frame_index = 0
+        self.review_player = None
+        self.review_frame_count_ready.connect(self.update_review_range)
         self.default_logo_path = "assets/default_logo.png"  # Укажите ваш путь
 
     def init_ui(self):
@@ -58,7 +68,7 @@ class VideoProcessorUI(QMainWindow):
                 file_filter="*.mp4 *.mpg *.avi *.webm"
             ),
             self.create_file_row(
-                placeholder="Select a YOLO model file...",
+                placeholder="Select one or more YOLO model files...",
                 attr_name="model_path",
                 btn_text="Choose Model",
                 file_filter="*.pt"
@@ -98,6 +108,27 @@ class VideoProcessorUI(QMainWindow):
         self.theme_btn.setStyleSheet("font-size: 14px;")
         self.theme_btn.clicked.connect(self.toggle_theme)
 
+        # Просмотр входного и обработанного видео
+        review_group = QGroupBox("Review")
+        review_layout = QVBoxLayout()
+        review_buttons = QHBoxLayout()
+        self.review_input_btn = QPushButton("Review Input")
+        self.review_input_btn.clicked.connect(lambda: self.open_review(self.input_path.text(), annotate=True))
+        self.review_output_btn = QPushButton("Review Output")
+        self.review_output_btn.clicked.connect(lambda: self.open_review(self.output_path.text(), annotate=False))
+        self.prev_frame_btn = QPushButton("<")
+        self.prev_frame_btn.clicked.connect(lambda: self.step_review(-1))
+        self.next_frame_btn = QPushButton(">")
+        self.next_frame_btn.clicked.connect(lambda: self.step_review(1))
+        for button in (self.review_input_btn, self.review_output_btn, self.prev_frame_btn, self.next_frame_btn):
+            review_buttons.addWidget(button)
+        self.review_slider = QSlider(Qt.Horizontal)
+        self.review_slider.setEnabled(False)
+        self.review_slider.valueChanged.connect(self.seek_review)
+        review_layout.addLayout(review_buttons)
+        review_layout.addWidget(self.review_slider)
+        review_group.setLayout(review_layout)
+
         # Превью видео
         self.video_label = QLabel("Video Preview", self)
         self.video_label.setAlignment(Qt.AlignCenter)
@@ -123,6 +154,7 @@ class VideoProcessorUI(QMainWindow):
         left_layout.addWidget(self.process_btn)
         left_layout.addWidget(self.freeze_btn)
         left_layout.addWidget(self.theme_btn)
+        left_layout.addWidget(review_group)
         left_layout.addWidget(self.video_label)
         left_layout.addWidget(self.status_label)
 
@@ -153,9 +185,15 @@ class VideoProcessorUI(QMainWindow):
         self.theme_btn.setText("Switch to Light Mode" if self.current_theme == "dark" else "Switch to Dark Mode")
 
         # Сохранить текущую тему в настройках
-        settings = ConfigHandler.load_settings()
-        settings["theme"] = self.current_theme
-        ConfigHandler.save_settings(settings)
+        ConfigHandler.update_settings(theme=self.current_theme)
+
+    def closeEvent(self, event):
+        """Flushes pending settings to disk before the window closes."""
+        ConfigHandler.flush()
+        self.close_review()
+        if self.model is not None:
+            self.model.close()
+        super().closeEvent(event)
 
     def apply_theme(self):
         """Applies the current theme to the application."""
@@ -246,9 +284,7 @@ class VideoProcessorUI(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Output Folder")
         if folder:
             self.output_path.setText(folder)
-            settings = ConfigHandler.load_settings()
-            settings["output_folder"] = folder
-            ConfigHandler.save_settings(settings)
+            ConfigHandler.update_settings(output_folder=folder)
 
     def create_folder_row(self, placeholder, attr_name, btn_text):
         layout = QHBoxLayout()
@@ -287,29 +323,23 @@ class VideoProcessorUI(QMainWindow):
         elif attr_name == "logo_path":
             start_path = settings.get("last_logo_path", "")
 
-        # Вызываем диалог выбора файла
-        path, _ = QFileDialog.getOpenFileName(self, placeholder, start_path, file_filter)
+        # Вызываем диалог выбора файла (для моделей допускается несколько файлов)
+        if attr_name == "model_path":
+            paths, _ = QFileDialog.getOpenFileNames(self, placeholder, start_path.split(";")[0], file_filter)
+            path = ";".join(paths)
+        else:
+            path, _ = QFileDialog.getOpenFileName(self, placeholder, start_path, file_filter)
         
         if path:
             line_edit.setText(path)
             
             # Сохраняем выбранный путь в настройки
             if attr_name == "input_path":
-                settings["last_video_path"] = path
+                ConfigHandler.update_settings(last_video_path=path)
             elif attr_name == "model_path":
-                settings["last_model_path"] = path
+                ConfigHandler.update_settings(last_model_path=path)
             elif attr_name == "logo_path":
-                settings["last_logo_path"] = path
-            
-            ConfigHandler.save_settings(settings)
-            
-            # Автоматически искать JSON для модели
-            if attr_name == "model_path":
-                model_dir, model_name = os.path.split(path)
-                json_path = os.path.join(model_dir, f"{os.path.splitext(model_name)[0]}.json")
-                if os.path.exists(json_path):
-                    self.class_names = load_classes(json_path)
-  
+                ConfigHandler.update_settings(last_logo_path=path)
 
     def freeze_frame(self):
         """Freezes the current frame and adds it to the list of frozen frames."""
@@ -371,8 +401,12 @@ class VideoProcessorUI(QMainWindow):
             self.status_label.setText("Fill in all required fields!")
             return
 
-        settings = ConfigHandler.load_settings()
-        output_folder = settings.get("output_folder", "")
+        model_paths = [p.strip() for p in model_path.split(";") if p.strip()]
+        if not model_paths:
+            self.status_label.setText("Select at least one model file!")
+            return
+
+        output_folder = ConfigHandler.store().get("output_folder", "")
         if not output_folder or not os.path.isdir(output_folder):
             self.status_label.setText("Output folder not configured or invalid!")
             return
@@ -380,11 +414,18 @@ class VideoProcessorUI(QMainWindow):
         output_path = generate_output_filename(input_path, output_folder)
         self.output_path.setText(output_path)
 
-        json_path = find_json_for_model(model_path)
-        if json_path:
-            self.class_names = load_classes(json_path)
-
-        self.model = load_model(model_path)
+        self.close_review()
+        self.detections = {}
+        self.detections_path = input_path
+        self.frame_index = 0
+
+        # Все выбранные модели работают над одним декодированным кадром
+        if self.model is not None:
+            self.model.close()
+        self.model = MultiModelRunner()
+        for path in model_paths:
+            self.model.register(path)
+        self.class_names = self.model.class_names
         self.cap, self.writer = init_video_processing(input_path, output_path)
 
         self.timer.timeout.connect(lambda: self.process_video_frame(logo_path))
@@ -392,12 +433,109 @@ class VideoProcessorUI(QMainWindow):
 
 
     def process_video_frame(self, logo_path):
-        frame, finished = process_frame(self.cap, self.model, self.writer, self.class_names, logo_path)
+        frame_detections = []
+        frame, finished = process_frame(self.cap, self.model, self.writer, self.class_names, logo_path,
+                                        detections=frame_detections)
         if finished:
             self.timer.stop()
-            finalize_processing(self.cap, self.writer)
-            self.status_label.setText(f"Processing complete! File saved at: {self.output_path.text()}")
+            report = self.model.timing_report()
+            self.model.close()
+            finalize_processing(self.cap, self.writer, report=f"Model timings: {report}")
+            self.status_label.setText(f"Processing complete! File saved at: {self.output_path.text()}\n{report}")
             return
 
+        self.detections[self.frame_index] = frame_detections
+        self.frame_index += 1
         self.frame_buffer.append(frame)
         self.display_frame(self.video_label, frame)
+
+    def open_review(self, path, annotate):
+        """
+        Opens a video for frame-accurate review in the preview.
+
+        :param path: Path to the input or processed video.
+        :param annotate: Draw stored detections on the fly (for the unprocessed input);
+            only applies when the detections were produced for this file.
+        """
+        if self.timer.isActive():
+            self.status_label.setText("Wait for processing to finish before reviewing.")
+            return
+        if not path or not os.path.isfile(path):
+            self.status_label.setText("Video file not found!")
+            return
+
+        self.close_review()
+        try:
+            self.review_player = ReviewPlayer(
+                path,
+                detections=self.detections if annotate and self.is_detections_source(path) else None,
+                class_names=self.class_names,
+                on_frame_count=lambda count: self.review_frame_count_ready.emit(path, count),
+            )
+        except IOError as e:
+            self.status_label.setText(str(e))
+            return
+
+        # Пока длина неизвестна, ползунок расширяется по мере продвижения по видео
+        frame_count = self.review_player.frame_count or 1
+        self.review_slider.blockSignals(True)
+        self.review_slider.setRange(0, frame_count - 1)
+        self.review_slider.setValue(0)
+        self.review_slider.blockSignals(False)
+        self.review_slider.setEnabled(True)
+        self.seek_review(0)
+
+    def update_review_range(self, path, frame_count):
+        """Applies the exact frame count reported once the keyframe index is built."""
+        if self.review_player is None or self.review_player.path != path:
+            return
+        self.review_slider.blockSignals(True)
+        self.review_slider.setRange(0, frame_count - 1)
+        self.review_slider.blockSignals(False)
+
+    def is_detections_source(self, path):
+        """Checks whether the stored detections were produced for the given video."""
+        return bool(self.detections_path) and os.path.abspath(path) == os.path.abspath(self.detections_path)
+
+    def close_review(self):
+        """Releases the current review player, if any."""
+        if self.review_player is not None:
+            self.review_player.close()
+            self.review_player = None
+            self.review_slider.setEnabled(False)
+
+    def seek_review(self, index):
+        """Shows the frame at the given index of the reviewed video."""
+        if self.review_player is None:
+            return
+        frame = self.review_player.seek(index)
+        position = self.review_player.position
+
+        # Синхронизируем ползунок с фактической позицией
+        self.review_slider.blockSignals(True)
+        if position > self.review_slider.maximum():
+            self.review_slider.setMaximum(position)
+        self.review_slider.setValue(position)
+        self.review_slider.blockSignals(False)
+
+        if frame is None:
+            return
+        self.frame_buffer.append(frame)
+        self.display_frame(self.video_label, frame)
+        frame_count = self.review_player.frame_count or "?"
+        self.status_label.setText(
+            f"Frame {position + 1}/{frame_count} ({position / self.review_player.fps:.2f} s)"
+        )
+
+    def step_review(self, delta):
+        """Steps the reviewed video forward or back by delta frames."""
+        if self.review_player is None:
+            return
+        self.seek_review(self.review_player.position + delta)
+
+    def keyPressEvent(self, event):
+        """Left/Right arrows step through the reviewed video."""
+        if self.review_player is not None and event.key() in (Qt.Key_Left, Qt.Key_Right):
+            self.step_review(-1 if event.key() == Qt.Key_Left else 1)
+        else:
+            super().keyPressEvent(event)
@@ -1,29 +1,225 @@
 import json
 import os
+import stat
+import tempfile
+import threading
 import uuid
 
+from filelock import FileLock, Timeout
+
+DEFAULT_SETTINGS = {
+    "output_folder": "",
+    "last_video_path": "",
+    "last_model_path": "",
+    "last_logo_path": ""
+}
+
+
+class SettingsStore:
+    """
+    Хранилище настроек в памяти.
+
+    Файл читается один раз и повторно только при изменении mtime (правка
+    другим экземпляром приложения или внешним редактором). Запись
+    откладывается и объединяется: изменения сбрасываются на диск фоновым
+    таймером через временный файл и атомарный os.replace. Цикл
+    чтение-слияние-замена защищён межпроцессной блокировкой (файл .lock рядом
+    с настройками), чтобы параллельные экземпляры не теряли изменения друг друга.
+    """
+
+    def __init__(self, path, flush_delay=0.5, retry_delay=5, lock_timeout=5):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.retry_delay = retry_delay
+        self._file_lock = FileLock(f"{path}.lock", timeout=lock_timeout)
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # Упорядочивает записи, читателей не блокирует
+        self._settings = None
+        self._mtime = None
+        self._dirty = {}
+        self._flushing = {}  # Изменения, которые сейчас записываются на диск
+        self._timer = None
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_file(self):
+        """
+        Читает файл настроек.
+
+        :return: Настройки; значения по умолчанию, если файла нет;
+            None, если файл не удалось прочитать или разобрать.
+        """
+        try:
+            with open(self.path, "r") as file:
+                settings = json.load(file)
+        except FileNotFoundError:
+            return dict(DEFAULT_SETTINGS)
+        except (OSError, ValueError) as e:
+            print(f"Error: Unable to read settings from {self.path}: {e}")
+            return None
+        return settings if isinstance(settings, dict) else None
+
+    def _refresh(self):
+        """Перечитывает файл, если он изменился с момента последнего чтения."""
+        mtime = self._file_mtime()
+        if self._settings is None or mtime != self._mtime:
+            settings = self._read_file()
+            if settings is None:
+                # Файл недоступен или записан не полностью: оставляем последние
+                # прочитанные настройки и не запоминаем mtime, чтобы повторить чтение
+                if self._settings is None:
+                    self._settings = dict(DEFAULT_SETTINGS)
+                    self._settings.update(self._flushing)
+                    self._settings.update(self._dirty)
+                return
+            # Несохранённые изменения имеют приоритет над содержимым диска
+            settings.update(self._flushing)
+            settings.update(self._dirty)
+            self._settings = settings
+            self._mtime = mtime
+
+    def load(self):
+        """Возвращает копию текущих настроек."""
+        with self._lock:
+            self._refresh()
+            return dict(self._settings)
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._refresh()
+            return self._settings.get(key, default)
+
+    def update(self, changes):
+        """Применяет изменения в памяти и планирует отложенную запись."""
+        with self._lock:
+            self._refresh()
+            changes = {k: v for k, v in changes.items() if self._settings.get(k, object()) != v}
+            if not changes:
+                return
+            self._settings.update(changes)
+            self._dirty.update(changes)
+            self._schedule_flush()
+
+    def save(self, settings):
+        """Сохраняет полный словарь настроек (изменённые ключи)."""
+        self.update(settings)
+
+    def _schedule_flush(self, delay=None):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay if delay is None else delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """
+        Немедленно записывает накопленные изменения на диск.
+
+        Файловые операции выполняются без основной блокировки, чтобы медленный
+        диск не задерживал чтение настроек из UI-потока.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                pending = self._flushing = dict(self._dirty)
+                self._dirty.clear()
+
+            try:
+                # Блокировка на весь цикл чтение-слияние-замена-stat, иначе другой
+                # экземпляр может заменить файл между нашим чтением и записью
+                with self._file_lock:
+                    settings, mtime = self._write_merged(pending)
+            except (OSError, Timeout) as e:
+                print(f"Error: Unable to save settings to {self.path}: {e}")
+                settings = None
+
+            with self._lock:
+                self._flushing = {}
+                if settings is None:
+                    # Возвращаем изменения в очередь, не затирая более новые, и повторяем позже
+                    for key, value in pending.items():
+                        self._dirty.setdefault(key, value)
+                    self._schedule_flush(self.retry_delay)
+                    return
+                # Изменения, сделанные во время записи, остаются в очереди
+                settings.update(self._dirty)
+                self._settings = settings
+                self._mtime = mtime
+
+    def _write_merged(self, pending):
+        """
+        Объединяет изменения с актуальным содержимым файла и атомарно заменяет его.
+
+        :return: Кортеж (записанные настройки, mtime) или (None, None), если файл
+            существует, но не читается — тогда он не перезаписывается.
+        """
+        exists = os.path.exists(self.path)
+        settings = self._read_file()
+        if settings is None:
+            return None, None
+        settings.update(pending)
+
+        # mkstemp создаёт файл с правами 0600; сохраняем права исходного файла,
+        # чтобы настройки оставались доступны другим пользователям
+        mode = stat.S_IMODE(os.stat(self.path).st_mode) if exists else 0o644
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(settings, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return settings, self._file_mtime()
+
+
 class ConfigHandler:
     CONFIG_FILE = "settings.json"
+    _store = None
+
+    @staticmethod
+    def store():
+        """Возвращает общее хранилище настроек для CONFIG_FILE."""
+        store = ConfigHandler._store
+        if store is None or store.path != ConfigHandler.CONFIG_FILE:
+            if store is not None:
+                store.flush()
+            store = ConfigHandler._store = SettingsStore(ConfigHandler.CONFIG_FILE)
+        return store
 
     @staticmethod
     def load_settings():
-        """Загружает настройки из JSON-файла."""
-        if os.path.exists(ConfigHandler.CONFIG_FILE):
-            with open(ConfigHandler.CONFIG_FILE, "r") as file:
-                return json.load(file)
-        # Возвращаем настройки по умолчанию
-        return {
-            "output_folder": "",
-            "last_video_path": "",
-            "last_model_path": "",
-            "last_logo_path": ""
-        }
+        """Загружает настройки (из памяти, с перечитыванием при изменении файла)."""
+        return ConfigHandler.store().load()
 
     @staticmethod
     def save_settings(settings):
-        """Сохраняет настройки в JSON-файл."""
-        with open(ConfigHandler.CONFIG_FILE, "w") as file:
-            json.dump(settings, file, indent=4)
+        """Сохраняет настройки; запись на диск выполняется в фоне."""
+        ConfigHandler.store().save(settings)
+
+    @staticmethod
+    def update_settings(**changes):
+        """Изменяет отдельные ключи настроек."""
+        ConfigHandler.store().update(changes)
+
+    @staticmethod
+    def flush():
+        """Принудительно сбрасывает отложенные изменения на диск."""
+        if ConfigHandler._store is not None:
+            ConfigHandler._store.flush()
 
 
 def generate_output_filename(input_path, output_folder):
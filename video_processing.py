@@ -29,15 +29,28 @@ def init_video_processing(input_path: str, output_path: str):
 
     return cap, writer
 
-def process_frame(cap, model, writer, class_names, logo_path=None):
+def build_class_lookup(class_names):
     """
-    Processes a single video frame with category-based bounding box styles.
+    Flattens category-grouped class names into a lookup table.
 
-    :param cap: VideoCapture object for reading the video.
-    :param model: Loaded YOLO model.
-    :param writer: VideoWriter object for saving processed frames.
     :param class_names: Dictionary mapping categories to class indices and names.
-    :return: Tuple (processed frame, completion flag).
+    :return: Dictionary mapping class index to (category, class name).
+    """
+    class_lookup = {}
+    for category, classes in (class_names or {}).items():
+        for class_id, class_name in classes.items():
+            # Namespaced IDs ("egds:3") from MultiModelRunner are kept as strings
+            key = int(class_id) if str(class_id).isdigit() else class_id
+            class_lookup[key] = (category, class_name)
+    return class_lookup
+
+def draw_detections(frame, detections, class_names):
+    """
+    Draws detections on the frame with category-based bounding box styles.
+
+    :param frame: Video frame (BGR) to draw on in place.
+    :param detections: List of (x1, y1, x2, y2, class index, confidence %) tuples.
+    :param class_names: Dictionary mapping categories to class indices and names.
     """
     # Define styles for categories
     category_styles = {
@@ -47,31 +60,38 @@ def process_frame(cap, model, writer, class_names, logo_path=None):
         "artifacts": Ellipse(color=(255, 0, 0))    # Blue rounded box
     }
 
-    # Flatten class names into a lookup table
-    class_lookup = {}
-    for category, classes in class_names.items():
-        for class_id, class_name in classes.items():
-            class_lookup[int(class_id)] = (category, class_name)
+    class_lookup = build_class_lookup(class_names)
+
+    for x1, y1, x2, y2, cls, confidence in detections:
+        # Lookup class name and category
+        category, class_name = class_lookup.get(cls, ("Unknown", "Unknown"))
+
+        # Determine the style and draw
+        style = category_styles.get(category, RoundedBox(color=(255, 255, 255)))
+        style.draw(frame, x1, y1, x2, y2, f"{class_name} {int(confidence)}%")
+
+def process_frame(cap, model, writer, class_names, logo_path=None, detections=None):
+    """
+    Processes a single video frame with category-based bounding box styles.
 
+    :param cap: VideoCapture object for reading the video.
+    :param model: Object with a detect(frame) method returning detections (e.g. MultiModelRunner).
+    :param writer: VideoWriter object for saving processed frames.
+    :param class_names: Dictionary mapping categories to class indices and names.
+    :param detections: Optional list that receives the frame detections for later review.
+    :return: Tuple (processed frame, completion flag).
+    """
     ret, frame = cap.read()
     if not ret:
         return None, True  # Return None and completion flag
 
-    # Run the frame through the model
-    results = model(frame, stream=True)
-    for r in results:
-        boxes = r.boxes
-        for box in boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cls = int(box.cls[0])
-            confidence = box.conf[0] * 100
+    # Run the frame through the model(s)
+    frame_detections = model.detect(frame)
 
-            # Lookup class name and category
-            category, class_name = class_lookup.get(cls, ("Unknown", "Unknown"))
+    if detections is not None:
+        detections.extend(frame_detections)
 
-            # Determine the style and draw
-            style = category_styles.get(category, RoundedBox(color=(255, 255, 255)))
-            style.draw(frame, x1, y1, x2, y2, f"{class_name} {int(confidence)}%")
+    draw_detections(frame, frame_detections, class_names)
 
     # Add the logo if a path is provided
     if logo_path:
@@ -82,15 +102,17 @@ def process_frame(cap, model, writer, class_names, logo_path=None):
 
     return frame, False
 
-def finalize_processing(cap, writer):
+def finalize_processing(cap, writer, report=None):
     """
     Releases resources associated with video processing.
 
     :param cap: VideoCapture object.
     :param writer: VideoWriter object.
+    :param report: Optional summary (e.g. model timings) appended to the completion message.
     """
     if cap:
         cap.release()
     if writer:
         writer.release()
-    print("Processing complete and resources released.")
+    message = "Processing complete and resources released."
+    print(f"{message} {report}" if report else message)